@@ -1,13 +1,17 @@
 from dataclasses import dataclass
-import pyaes
+from Cryptodome.Cipher import AES
 import logging
 import enum
 import asyncio
+import collections
 import bleak
+from bleak.exc import BleakError
 
 logging.basicConfig()
 logger = logging.getLogger(__name__)
 
+_AUTH_CHAR_UUID = "00000009-0000-3512-2118-0009af100700"
+
 class AuthReply(enum.Enum):
     KEY_ACCEPTED = b'\x10\x01\x01'
     RAND_MSG_RECEIVED = b'\x10\x02\x01'
@@ -15,6 +19,11 @@ class AuthReply(enum.Enum):
     KEY_MISMATCH = b'\x10\x03\x04'
     KEY_ABORTED = b'\x10\x01\x02'
 
+_CODE_TO_REPLY = {r.value: r for r in AuthReply}
+_KEY_ACCEPTED = AuthReply.KEY_ACCEPTED.value
+_RAND_MSG_RECEIVED = AuthReply.RAND_MSG_RECEIVED.value
+_AUTH_OK = AuthReply.AUTH_OK.value
+
 @dataclass
 class Key:
     key: bytes
@@ -26,51 +35,64 @@ class Session:
         self.key = key.key
         self.reset = key.reset
         self.mac = dev.address
+        self._cipher = AES.new(self.key, AES.MODE_ECB)
+        self._auth_char = dev.services.get_characteristic(_AUTH_CHAR_UUID)
+        if self._auth_char is None:
+            raise BleakError(f"characteristic {_AUTH_CHAR_UUID} not found")
+        self._reply = None
+        self._early_replies = collections.deque()
 
     async def _send_auth_msg(self, data):
-        await self.dev.write_gatt_char("00000009-0000-3512-2118-0009af100700", bytes(data))
+        await self.dev.write_gatt_char(self._auth_char, data)
 
-    async def start_replies_collection(self):
-        q = asyncio.Queue()
-        async def signal_accumulator(_, data):
-            await q.put(data)
+    def _on_reply(self, _, data):
+        if self._reply is None:
+            self._log(f"no reply pending, dropped {bytes(data)}")
+        elif self._reply.done():
+            self._early_replies.append(data)
+        else:
+            self._reply.set_result(data)
 
-        await self.dev.start_notify("00000009-0000-3512-2118-0009af100700", signal_accumulator)
-        return q
-    
-    async def stop_replies_collection(self):
-        await self.dev.stop_notify("00000009-0000-3512-2118-0009af100700")
+    def _arm_reply(self, loop):
+        self._reply = loop.create_future()
+        if self._early_replies:
+            self._reply.set_result(self._early_replies.popleft())
 
     async def start(self):
         init_func, handlers = self.make_handlers_chain()
-        auth_replies_queue = await self.start_replies_collection()
+        loop = asyncio.get_running_loop()
+        self._arm_reply(loop)
+        await self.dev.start_notify(self._auth_char, self._on_reply)
         await init_func()
-        while handlers:
-            data = await auth_replies_queue.get()
+        for exp_code, handler in handlers:
+            data = await self._reply
+            self._arm_reply(loop)
             code, msg = self._parse_msg(data)
-            exp_code, handler = handlers.pop(0)
-            if code != exp_code.value:
+            if code != exp_code:
                 break
             await handler(msg)
-        await self.stop_replies_collection()
+        await self.dev.stop_notify(self._auth_char)
+        self._reply = None
+        self._early_replies.clear()
         return self._parse_status(code)
 
     def _parse_msg(self, msg):
-        return bytes(msg[:3]), msg[3:]
+        mv = memoryview(msg)
+        return bytes(mv[:3]), mv[3:]
     
     def make_handlers_chain(self):
         handlers = []
         auth_init_func = None
         if self.reset:
             auth_init_func = self._send_key
-            handlers.append((AuthReply.KEY_ACCEPTED, self.handle_key_accepted))
+            handlers.append((_KEY_ACCEPTED, self.handle_key_accepted))
         else:
             auth_init_func = self._req_secret
         
-        handlers.append((AuthReply.RAND_MSG_RECEIVED, self._send_enc_msg))
-        handlers.append((AuthReply.AUTH_OK, self.handle_done))
+        handlers.append((_RAND_MSG_RECEIVED, self._send_enc_msg))
+        handlers.append((_AUTH_OK, self.handle_done))
 
-        return (auth_init_func, handlers)
+        return (auth_init_func, tuple(handlers))
 
     async def handle_done(self, _):
         self._log("auth complete")
@@ -81,22 +103,22 @@ class Session:
 
     async def _req_secret(self):
         self._log("requesting a secret", issent=True)
-        await self._send_auth_msg([2,0])
+        await self._send_auth_msg(b'\x02\x00')
         
     async def _send_key(self):
         self._log("sending a key", issent=True)
-        await self._send_auth_msg([1,0] + list(self.key))
+        await self._send_auth_msg(b'\x01\x00' + self.key)
 
     async def _send_enc_msg(self, msg):
         self._log("secret received")
         self._log("sending an encrypted secret", issent=True)
-        aes = pyaes.AESModeOfOperationECB(self.key)
-        msg = list(aes.encrypt(bytes(msg)))
-        await self._send_auth_msg([3,0] + msg)
+        await self._send_auth_msg(b'\x03\x00' + self._cipher.encrypt(bytes(msg)))
 
     def _log(self, msg, issent=False):
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
         dirlabel = "<-" if issent else "->"
         logger.debug("%s %s host : %s", self.mac, dirlabel, msg)
 
     def _parse_status(self, code):
-        return next(filter(lambda s: s.value == code, AuthReply), Exception(f"unknown status code: {code}"))
+        return _CODE_TO_REPLY.get(code, Exception(f"unknown status code: {code}"))
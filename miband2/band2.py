@@ -1,9 +1,24 @@
+import asyncio
 import bleak
+from bleak.exc import BleakError
+import logging
 import struct
 import enum
 from datetime import datetime
 from . import authsession
 
+logger = logging.getLogger(__name__)
+
+_ALERT_UUID = "00002a06-0000-1000-8000-00805f9b34fb"
+_TIME_UUID = "00002a2b-0000-1000-8000-00805f9b34fb"
+_BATT_UUID = "00000006-0000-3512-2118-0009af100700"
+_ALARM_UUID = "00000003-0000-3512-2118-0009af100700"
+_HB_NOTIFY_UUID = "00002a37-0000-1000-8000-00805f9b34fb"
+_HB_CTRL_UUID = "00002a39-0000-1000-8000-00805f9b34fb"
+
+_DT_STRUCT = struct.Struct('hbbbbbbxxx')
+_BATT_TS_STRUCT = struct.Struct('hbbxxx')
+
 class NotificationType(enum.Enum):
     SINGLE = 1
     CONTINUOS = 2
@@ -13,39 +28,59 @@ class NotificationType(enum.Enum):
 class Band2:
     def __init__(self, dev: bleak.BleakClient) -> None:
         self.device = dev
+        self._chars = {}
 
     async def connect(self):
         await self.device.connect()
+        self._chars.clear()
 
     async def disconnect(self):
         await self.device.disconnect()
+        self._chars.clear()
 
     async def __aenter__(self):
         await self.device.__aenter__()
+        self._chars.clear()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await self.device.__aexit__(exc_type, exc_val, exc_tb)
+        self._chars.clear()
+
+    def _char(self, uuid):
+        char = self._chars.get(uuid)
+        if char is None:
+            char = self.device.services.get_characteristic(uuid)
+            if char is None:
+                raise BleakError(f"characteristic {uuid} not found")
+            self._chars[uuid] = char
+        return char
+
+    async def _write_command(self, uuid, data):
+        char = self._char(uuid)
+        if "write-without-response" in char.properties:
+            await self.device.write_gatt_char(char, data, response=False)
+        else:
+            await self.device.write_gatt_char(char, data)
 
     async def ring(self, ring: NotificationType):
-        await self.device.write_gatt_char("00002a06-0000-1000-8000-00805f9b34fb", bytes([ring.value]))
+        await self._write_command(_ALERT_UUID, bytes([ring.value]))
 
     async def set_datetime(self, dt: datetime):
         data = _pack_datetime(dt)
-        await self.device.write_gatt_char("00002a2b-0000-1000-8000-00805f9b34fb", data)
+        await self._write_command(_TIME_UUID, data)
 
     async def get_datetime(self):
-        raw_data = await self.device.read_gatt_char("00002a2b-0000-1000-8000-00805f9b34fb")
-        data = struct.unpack('hbbbbbbxxx', raw_data)
-        return datetime(*data)
+        raw_data = await self.device.read_gatt_char(self._char(_TIME_UUID))
+        return _unpack_datetime(raw_data)
 
     async def get_battery(self):
-        data = await self.device.read_gatt_char("00000006-0000-3512-2118-0009af100700")
+        data = await self.device.read_gatt_char(self._char(_BATT_UUID))
         level = data[1]
         status = 'normal' if data[2] == 0 else "charging"
 
-        last_charge = struct.unpack("hbbxxx", data[11:18])
-        last_off = struct.unpack("hbbxxx", data[3:10])
+        last_charge = _BATT_TS_STRUCT.unpack(data[11:18])
+        last_off = _BATT_TS_STRUCT.unpack(data[3:10])
 
         return {
             'level': int(level),
@@ -54,15 +89,24 @@ class Band2:
             'last_charge': datetime(*last_charge)
         }
     
+    async def get_status(self):
+        """
+        Read battery info and current date/time concurrently
+
+        Returns a tuple of `get_battery()` and `get_datetime()` results
+        """
+        batt, dt = await asyncio.gather(self.get_battery(), self.get_datetime())
+        return batt, dt
+
     async def request_heartbeat(self, callback):
         async def cb(char, data):
-            print(f"hb received from: {char}")
-            await self.device.stop_notify("00002a37-0000-1000-8000-00805f9b34fb")
+            logger.debug("hb received from: %s", char)
+            await self.device.stop_notify(self._char(_HB_NOTIFY_UUID))
             callback(data[1])
 
-        await self.device.start_notify("00002a37-0000-1000-8000-00805f9b34fb", cb)
-        await self.device.write_gatt_char("00002a39-0000-1000-8000-00805f9b34fb", b'\x15\x02\x00')
-        await self.device.write_gatt_char("00002a39-0000-1000-8000-00805f9b34fb", b'\x15\x02\x01')
+        await self.device.start_notify(self._char(_HB_NOTIFY_UUID), cb)
+        await self._write_command(_HB_CTRL_UUID, b'\x15\x02\x00')
+        await self.device.write_gatt_char(self._char(_HB_CTRL_UUID), b'\x15\x02\x01')
 
     async def set_onetime_alarm(self, slot, h, m):
         """
@@ -101,7 +145,7 @@ class Band2:
     async def _setup_alarm(self, slot, action_mask, hrs_mins_tuple, days_mask):
         h, m = hrs_mins_tuple
         data = bytes([2, action_mask | slot, h, m, days_mask])
-        await self.device.write_gatt_char("00000003-0000-3512-2118-0009af100700", data)
+        await self._write_command(_ALARM_UUID, data)
 
     # async def get_alarms(self):
     #     return await self.device.write_gatt_char("00000003-0000-3512-2118-0009af100700", 0x0d, response=True)
@@ -111,12 +155,12 @@ class Band2:
         return await s.start()
     
 def _unpack_datetime(raw_data):
-    data = struct.unpack('hbbbbbbxxx', raw_data)
+    data = _DT_STRUCT.unpack(raw_data)
     return datetime(*data)
 
 def _pack_datetime(datetime_obj):
     dt = datetime_obj
-    return struct.pack('hbbbbbbxxx', dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second, dt.weekday())
+    return _DT_STRUCT.pack(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second, dt.weekday())
 
 def _days_to_bitmask(days):
     mask = 0